@@ -1,36 +1,90 @@
 #!/usr/bin/env python3
-import argparse, sys, time, re, datetime, os
-from typing import List, Dict, Any
+import argparse, sys, time, re, datetime, os, threading, queue, io, json
+from typing import List, Dict, Any, Optional, Callable, Tuple
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("This script requires the 'requests' package. Install it with: pip install requests")
     sys.exit(1)
 
+# Optional: llm_cache.py (kept next to this script) is only needed for --cache
+try:
+    from llm_cache import ResponseCache, cache_key
+except ImportError:
+    ResponseCache = cache_key = None
+
+# Optional: orjson encodes/decodes JSON several times faster (pip install orjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ---- helpers ----
 _PREFIX = re.compile(r"^\s*(thoughtful\s*question\s*:)\s*", re.I)
-INVALID_CHARS = re.compile(r'[<>:"/\\|?*]')  # Windows-invalid filename chars
+_INVALID_TABLE = str.maketrans({c: "_" for c in '<>:"/\\|?*'})  # Windows-invalid filename chars
+# Shared persona rules; each bot's system prompt is its identity line followed by these.
+PERSONA_COMMON = (
+    "Speak naturally and conversationally. Do NOT mention model names, training, providers, parameters, "
+    "or that you are an AI/model/assistant. Avoid phrases like 'as a language model'. "
+    "Reply clearly in <= 150 words and end with a single direct question if it helps the conversation flow."
+)
+CONNECT_TIMEOUT = 10  # seconds; a dead endpoint should fail fast, not after the full read timeout
+
+def dumps_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 def clean(text: str) -> str:
+    # Fast path: most replies don't start with the prefix, so skip the regex.
+    if text.lstrip()[:10].lower() != "thoughtful":
+        return text.strip()
     return _PREFIX.sub("", text).strip()
 
 def sanitize_filename(s: str) -> str:
-    s = INVALID_CHARS.sub("_", s)
-    s = s.strip().strip(".")
+    return s.translate(_INVALID_TABLE).strip().strip(".")
+
+def make_session(retries: int = 0, backoff: float = 0.0) -> requests.Session:
+    """
+    One keep-alive session per endpoint, reused for every call in the run, so each turn
+    skips the TCP (and TLS) handshake. Each session talks to a single host with at most a
+    couple of calls in flight, so a small pool is enough; Ollama only speaks HTTP/1.1, so
+    there is no multiplexing to gain.
+    Connect/read timeouts and 502/503/504 are retried by urllib3 with exponential backoff
+    (backoff * 2**n seconds). For streamed replies this only covers the wait for the
+    response headers, so text that has already streamed is never repeated.
+    """
+    s = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(502, 503, 504),
+                  allowed_methods=frozenset(["GET", "POST"]), respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=retry)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
     return s
 
-def fetch_models(base_url: str, timeout: int = 15) -> List[str]:
+class EndpointError(Exception):
+    """A call failed before any reply text arrived, so another endpoint can safely take it."""
+
+def fetch_models(base_url: str, timeout: int = 15, session: Optional[requests.Session] = None) -> List[str]:
+    # Raises EndpointError so EndpointPool.call can fail over to the next URL.
     url = base_url.rstrip("/") + "/api/tags"
-    r = requests.get(url, timeout=timeout)
-    r.raise_for_status()
-    data = r.json()
-    models = []
-    for m in data.get("models", []):
-        name = m.get("name") or m.get("model")
-        if name:
-            models.append(name)
-    return sorted(models)
+    try:
+        r = (session or requests).get(url, timeout=(CONNECT_TIMEOUT, timeout))
+        r.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        raise EndpointError(f"GET {url} failed: {e}") from e
+    data = loads(r.content)
+    # `model` only when `name` is missing; a set drops duplicate tags before sorting
+    names = (m.get("name") or m.get("model") for m in data.get("models", ()))
+    return sorted(set(filter(None, names)))
 
 def choose_from_list(title: str, items: List[str]) -> str:
     print(f"\n{title}")
@@ -70,8 +124,8 @@ def turns_prompt(default_turns: int = 50) -> int:
 def timestamp() -> str:
     return datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-def default_logname(aihub_model: str, node01_model: str) -> str:
-    ts = timestamp()
+def default_logname(aihub_model: str, node01_model: str, ts: Optional[str] = None) -> str:
+    ts = ts or timestamp()
     safe_a = sanitize_filename(aihub_model.replace("/", "_"))
     safe_n = sanitize_filename(node01_model.replace("/", "_"))
     return f"crosschat_{safe_a}__{safe_n}_{ts}.txt"
@@ -86,110 +140,423 @@ def uniquify_log_path(path: str, aihub_model: str, node01_model: str) -> str:
       - If 'path' is an existing directory OR ends with a separator -> create auto-named file inside it.
       - Otherwise treat as a filename and inject a timestamp before extension.
     """
+    ts = timestamp()
     if not path:
-        return default_logname(aihub_model, node01_model)
-    if os.path.isdir(path) or looks_like_dir_path(path):
-        return os.path.join(path.rstrip("/\\"), default_logname(aihub_model, node01_model))
+        return default_logname(aihub_model, node01_model, ts)
+    # The string check comes first so a trailing separator never costs a stat() call.
+    if looks_like_dir_path(path) or os.path.isdir(path):
+        return os.path.join(path.rstrip("/\\"), default_logname(aihub_model, node01_model, ts))
     base, ext = os.path.splitext(path)
-    return f"{base}_{timestamp()}{ext or '.txt'}"
+    return f"{base}_{ts}{ext or '.txt'}"
+
+_WRAP2 = ("[Wrap-up cue: there are two messages left in total. "
+          "Briefly summarise your view in 1–2 sentences and ask one short final question.]")
+_WRAP1 = ("[Final-turn cue: this is the last message. "
+          "Offer a quick thank-you and a clear goodbye. Do not ask another question.]")
 
-def trim_history(history: List[Dict[str, str]], keep_pairs: int) -> List[Dict[str, str]]:
+def trim_history(history: List[Dict[str, str]], keep_pairs: int) -> None:
     """
-    Keep the system message (index 0) and only the last N user/assistant pairs.
-    Set keep_pairs to 0 to keep only the system message.
+    Trim in place to the leading system message(s) (persona, plus the rolling summary if
+    there is one) and about N user/assistant pairs.
+    Set keep_pairs to 0 to keep only the system message(s).
+    Once the window is full, the opening N/2 pairs stay pinned and messages are evicted
+    from just after them, so the start of the prompt is byte-identical from turn to turn
+    and Ollama can serve it from its KV cache instead of prefilling it again.
+    A slice `del` shifts the tail down without building new lists each turn.
     """
     if keep_pairs is None:
-        return history
+        return
+    pinned = pinned_count(history)
     if keep_pairs <= 0:
-        return history[:1]
-    head = history[:1]
-    tail = history[1:][-2 * keep_pairs:]
-    return head + tail
-
-def relay_with_wrap(from_name: str, last_message: str, remaining_turns: int) -> str:
+        del history[pinned:]
+        return
+    kept = 2 * keep_pairs
+    if len(history) - pinned <= kept:
+        return
+    head = 2 * (keep_pairs // 2)
+    if not head:
+        # On a wrap-cue turn (two user messages) move back so the bot's latest reply stays.
+        cut = len(history) - kept
+        while cut > pinned and history[cut]["role"] != "assistant":
+            cut -= 1
+        del history[pinned:cut]
+        return
+    # The pinned pairs end on an assistant reply, so the tail must start at the first of a
+    # run of user messages to keep roles alternating across the gap. A wrap-cue turn relays
+    # two user messages, so the cut is found by role, moving back to keep an extra message
+    # rather than forward, which would evict the bot's latest exchange.
+    cut = len(history) - (kept - head + 1)
+    while cut > pinned + head and (history[cut]["role"] != "user" or history[cut - 1]["role"] == "user"):
+        cut -= 1
+    del history[pinned + head:cut]
+
+def pinned_count(history: List[Dict[str, str]]) -> int:
+    n = 0
+    while n < len(history) and history[n]["role"] == "system":
+        n += 1
+    return n
+
+def relay_with_wrap(from_name: str, last_message: str, remaining_turns: int) -> List[Dict[str, str]]:
     """
+    Returns the user message(s) relaying the peer's last message.
     Adds wrap-up cues in the final two turns:
       - remaining_turns == 2: start wrapping up, brief summary + one final short question.
       - remaining_turns == 1: final sign-off, thank you + goodbye, no new question.
+    The cue is sent as its own trailing message so the relayed text itself is unchanged.
     """
-    cue = ""
-    if remaining_turns == 2:
-        cue = ("\n\n[Wrap-up cue: there are two messages left in total. "
-               "Briefly summarise your view in 1–2 sentences and ask one short final question.]")
-    elif remaining_turns == 1:
-        cue = ("\n\n[Final-turn cue: this is the last message. "
-               "Offer a quick thank-you and a clear goodbye. Do not ask another question.]")
-    return f"From {from_name}: {last_message}{cue}"
+    relay = {"role": "user", "content": f"From {from_name}: {last_message}"}
+    if remaining_turns > 2:
+        return [relay]
+    return [relay, {"role": "user", "content": _WRAP2 if remaining_turns == 2 else _WRAP1}]
 
 # ---- chat core ----
+class MessageEncoder:
+    """
+    Serialises the message list for one bot's /api/chat bodies. Each history message is
+    encoded once and its bytes reused on later turns, so a turn costs O(new messages) of
+    JSON encoding instead of O(history). History messages must not be mutated once added.
+    """
+    def __init__(self):
+        self._cache: Dict[int, Tuple[Dict[str, str], bytes]] = {}
+
+    def encode(self, messages: List[Dict[str, str]]) -> bytes:
+        cache: Dict[int, Tuple[Dict[str, str], bytes]] = {}
+        parts = []
+        for m in messages:
+            hit = self._cache.get(id(m))
+            if hit is None or hit[0] is not m:
+                hit = (m, dumps_bytes(m))
+            cache[id(m)] = hit
+            parts.append(hit[1])
+        self._cache = cache  # drops anything trimmed out of the history
+        return b"[" + b",".join(parts) + b"]"
+
 def ollama_chat(base_url: str, model: str, messages: List[Dict[str, str]],
-                temperature: float, timeout: int, retries: int, backoff: float,
-                num_predict: int) -> str:
+                temperature: float, timeout: int,
+                num_predict: int, session: Optional[requests.Session] = None,
+                on_chunk: Optional[Callable[[str], None]] = None,
+                keep_alive: Optional[str] = None, num_ctx: int = 0,
+                encoder: Optional[MessageEncoder] = None, cache: "Optional[ResponseCache]" = None) -> str:
+    """
+    Streams the reply from /api/chat (NDJSON frames) and returns the full text.
+    on_chunk, if given, is called with each piece as it arrives for live display.
+    Retries come from the session's adapter (see make_session). Failures before any text
+    arrives raise EndpointError so an EndpointPool can fail over; later ones raise SystemExit.
+    keep_alive keeps the model (and its prompt cache) loaded between turns; a fixed num_ctx
+    avoids reloads caused by a changing context size. 0 leaves the server default.
+    Pass the bot's MessageEncoder so history messages are only serialised once per run.
+    With a cache, a repeat of a cacheable request is answered from it without calling Ollama.
+    """
+    key = None
+    if cache is not None and cache.cacheable(temperature):
+        key = cache_key(model, messages, temperature, num_predict)
+        hit = cache.get(key)
+        if hit is not None:
+            if on_chunk:
+                on_chunk(hit)
+            return hit
+
     url = base_url.rstrip('/') + "/api/chat"
     payload: Dict[str, Any] = {
         "model": model,
-        "messages": messages,
-        "stream": False,
+        "stream": True,
         "options": {
             "temperature": temperature,
             "num_predict": num_predict
         },
     }
-    attempt = 0
-    while True:
-        attempt += 1
-        try:
-            r = requests.post(url, json=payload, timeout=timeout)
-            r.raise_for_status()
-            data = r.json()
-            content = (data.get("message", {}) or {}).get("content", "").strip()
-            reason = data.get("done_reason")
-            if reason == "length":
-                print("[INFO] Reply hit num_predict limit; consider raising --num-predict.")
-            return content
-        except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout) as e:
-            if attempt <= retries:
-                wait = backoff * attempt
-                print(f"[WARN] Timeout calling {url} (attempt {attempt}/{retries}); retrying in {wait:.1f}s...")
-                time.sleep(wait)
+    if keep_alive:
+        payload["keep_alive"] = keep_alive
+    if num_ctx > 0:
+        payload["options"]["num_ctx"] = num_ctx
+    body = dumps_bytes(payload)[:-1] + b',"messages":' + (encoder or MessageEncoder()).encode(messages) + b"}"
+    try:
+        r = (session or requests).post(url, data=body, headers={"Content-Type": "application/json"},
+                                       stream=True, timeout=(CONNECT_TIMEOUT, timeout))
+        r.raise_for_status()
+    except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout) as e:
+        raise EndpointError(f"Timeout talking to {url}: {e}") from e
+    except requests.exceptions.RequestException as e:
+        raise EndpointError(f"HTTP error calling {url}: {e}") from e
+
+    buf = io.StringIO()
+    reason = None
+    try:
+        with r:
+            for raw in r.iter_lines():
+                if not raw:
+                    continue
+                frame = loads(raw)
+                if frame.get("error"):
+                    raise SystemExit(f"[ERROR] {url} returned an error: {frame['error']}")
+                chunk = (frame.get("message", {}) or {}).get("content", "")
+                if chunk:
+                    buf.write(chunk)
+                    if on_chunk:
+                        on_chunk(chunk)
+                if frame.get("done"):
+                    # No break: reading on to the end of the body lets urllib3 put the
+                    # connection back in the session's pool instead of closing it.
+                    reason = frame.get("done_reason")
+    except (requests.exceptions.RequestException, ValueError) as e:
+        raise SystemExit(f"[ERROR] Reply stream from {url} broke off: {e}")
+    if reason == "length":
+        print("\n[INFO] Reply hit num_predict limit; consider raising --num-predict.")
+    content = buf.getvalue().strip()
+    if key is not None:
+        cache.put(key, content)
+    return content
+
+class EndpointPool:
+    """
+    The base URL(s) serving one bot, each with its own pooled session. Calls stick to the
+    current endpoint (keeping its prompt cache warm) and move on to the next healthy one
+    when a call fails before any text arrives. An endpoint failing `max_fails` times in a row
+    is quarantined for `quarantine` seconds; any success resets its streak.
+    """
+    def __init__(self, urls: List[str], retries: int = 0, backoff: float = 0.0,
+                 max_fails: int = 3, quarantine: float = 30.0):
+        self.urls = urls
+        self.max_fails = max_fails
+        self.quarantine = quarantine
+        self.sessions = {u: make_session(retries, backoff) for u in urls}
+        self._state = {u: {"fail_streak": 0, "quarantined_until": 0.0} for u in urls}
+        self._current = 0
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self) -> str:
+        return self.urls[self._current]
+
+    def _candidates(self) -> List[str]:
+        now = time.time()
+        with self._lock:
+            ordered = self.urls[self._current:] + self.urls[:self._current]
+            return [u for u in ordered if self._state[u]["quarantined_until"] <= now]
+
+    def _record(self, url: str, ok: bool):
+        with self._lock:
+            state = self._state[url]
+            if ok:
+                state["fail_streak"] = 0
+                self._current = self.urls.index(url)
+                return
+            state["fail_streak"] += 1
+            if state["fail_streak"] >= self.max_fails:
+                state["quarantined_until"] = time.time() + self.quarantine
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        fn(url, *args, session=..., **kwargs) against each healthy endpoint until one succeeds.
+        Raises EndpointError once every candidate has failed; callers decide if that is fatal.
+        """
+        candidates = self._candidates()
+        if not candidates:
+            raise EndpointError(f"All endpoints are quarantined after repeated failures: {', '.join(self.urls)}")
+        for i, url in enumerate(candidates):
+            try:
+                result = fn(url, *args, session=self.sessions[url], **kwargs)
+            except EndpointError as e:
+                self._record(url, ok=False)
+                if i + 1 == len(candidates):
+                    raise
+                print(f"\n[WARN] {e}\n[WARN] Trying {candidates[i + 1]} instead.")
                 continue
-            raise SystemExit(f"[ERROR] Timeout talking to {url} after {retries} retries: {e}")
-        except requests.exceptions.RequestException as e:
-            raise SystemExit(f"[ERROR] HTTP error calling {url}: {e}")
+            self._record(url, ok=True)
+            return result
+
+SUMMARY_PREFIX = "Summary of the conversation so far: "
+
+def summarize_history(pool: EndpointPool, model: str, history: List[Dict[str, str]], pairs: int,
+                      speaker: str, timeout: int, keep_alive: Optional[str] = None, num_ctx: int = 0):
+    """
+    Folds the oldest `pairs` exchanges after the system message(s) into a single rolling
+    summary system message (kept right after the persona), so the context re-sent every turn
+    stays roughly constant instead of growing with the conversation. The latest exchange is
+    always kept verbatim.
+    """
+    pinned = pinned_count(history)
+    count = min(2 * pairs, len(history) - pinned - 2)
+    if count <= 0:
+        return
+    previous = history[1]["content"][len(SUMMARY_PREFIX):] if pinned > 1 else ""
+    lines = [f"{speaker}: {m['content']}" if m["role"] == "assistant" else m["content"]
+             for m in history[pinned:pinned + count]]
+    prompt = ("Summarize the following dialogue in about 120 words. Keep the main points, open "
+              "questions and who said what. Reply with the summary only.\n\n")
+    if previous:
+        prompt += f"Earlier summary: {previous}\n\n"
+    prompt += "\n".join(lines)
+    summary = pool.call(ollama_chat, model, [{"role": "user", "content": prompt}], 0.2, timeout, 200,
+                        keep_alive=keep_alive, num_ctx=num_ctx)
+    history[1:pinned + count] = [{"role": "system", "content": SUMMARY_PREFIX + summary}]
+
+def split_urls(value: str) -> List[str]:
+    return [u.strip() for u in value.split(",") if u.strip()]
+
+def warm_model(base_url: str, model: str, system: str, keep_alive: Optional[str] = None, num_ctx: int = 0,
+               timeout: int = 300, session: Optional[requests.Session] = None):
+    """
+    Loads `model` ahead of its first turn (Ollama loads lazily) and prefills the system prompt,
+    which every turn starts with byte-for-byte, so its KV cache is ready before turn 1.
+    Uses the same num_ctx as the chat calls, since a different context size would make Ollama
+    reload the model. Failures only warn; the chat will retry.
+    """
+    url = base_url.rstrip("/") + "/api/chat"
+    payload: Dict[str, Any] = {
+        "model": model,
+        "messages": [{"role": "system", "content": system}],
+        "stream": False,
+        "options": {"num_predict": 1},
+    }
+    if keep_alive:
+        payload["keep_alive"] = keep_alive
+    if num_ctx > 0:
+        payload["options"]["num_ctx"] = num_ctx
+    try:
+        r = (session or requests).post(url, json=payload, timeout=(CONNECT_TIMEOUT, timeout))
+        r.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"\n[WARN] Could not pre-load {model} on {base_url}: {e}")
 
-def log_line(fp, who: str, model: str, text: str, turn: int):
-    fp.write(f"Turn {turn} - {who} ({model})\n")
-    fp.write("-" * 60 + "\n")
-    fp.write(text.strip() + "\n\n")
-    fp.flush()
+def print_chunk(chunk: str):
+    print(chunk, end="", flush=True)
+
+class Inflight:
+    """
+    Runs fn(*args, **kwargs) on a daemon thread so the caller can keep working while a reply generates.
+    result() waits for it and re-raises anything the call raised (including SystemExit).
+    """
+    def __init__(self, fn, *args, **kwargs):
+        self._value: Any = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(fn, args, kwargs), daemon=True)
+        self._thread.start()
+
+    def _run(self, fn, args, kwargs):
+        try:
+            self._value = fn(*args, **kwargs)
+        except BaseException as e:
+            self._error = e
+
+    def result(self) -> Any:
+        # Short joins keep Ctrl-C responsive (lock waits aren't interruptible on Windows).
+        while self._thread.is_alive():
+            self._thread.join(0.5)
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+_HEADER_SEP = ("=" * 60 + "\n").encode()
+_DASH_SEP = ("-" * 60 + "\n").encode()
+
+class LogWriter:
+    """
+    Transcript file whose writes happen on a background thread: write() only enqueues
+    already-encoded bytes, so the turn loop never waits on disk and no text-mode encoding
+    layer sits in between. The file is flushed every `flush_every` writes and on close(),
+    which drains the queue, joins the thread and reports a write error if one occurred.
+    """
+    def __init__(self, path: str, flush_every: int = 4):
+        self._fp = open(path, "wb", buffering=1 << 20)
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._flush_every = flush_every
+        self._error: Optional[OSError] = None
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def write(self, data: bytes):
+        if self._error is None:  # after a failed write nothing is drained any more
+            self._queue.put(data)
+
+    def _drain(self):
+        unflushed = 0
+        try:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    break
+                self._fp.write(data)
+                unflushed += 1
+                if unflushed >= self._flush_every:
+                    self._fp.flush()
+                    unflushed = 0
+        except OSError as e:
+            self._error = e
+        finally:
+            try:
+                self._fp.close()
+            except OSError as e:
+                self._error = self._error or e
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise SystemExit(f"[ERROR] Transcript could not be written: {self._error}")
+
+    def __enter__(self) -> "LogWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            self.close()
+        except SystemExit as e:
+            if exc_type is None:
+                raise
+            print(e)  # don't mask the exception already on its way out
+
+def log_line(fp: LogWriter, who: str, model: str, text: str, turn: int):
+    fp.write(f"Turn {turn} - {who} ({model})\n".encode("utf-8") + _DASH_SEP + f"{text.strip()}\n\n".encode("utf-8"))
 
 # ---- main ----
 def main():
     p = argparse.ArgumentParser(description="Cross-chat between Bob (AIHub) and Jane (NODE01) via Ollama HTTP API.")
-    p.add_argument("--aihub-url", default="http://192.168.0.10:11434")
-    p.add_argument("--node01-url", default="http://192.168.0.16:31135")
+    p.add_argument("--aihub-url", default="http://192.168.0.10:11434",
+                   help="Bob's Ollama URL; give several comma-separated URLs to fail over between them")
+    p.add_argument("--node01-url", default="http://192.168.0.16:31135",
+                   help="Jane's Ollama URL; give several comma-separated URLs to fail over between them")
     p.add_argument("--turns", type=int, default=50)
     p.add_argument("--temperature", type=float, default=0.7)
     p.add_argument("--delay", type=float, default=0.4)
     p.add_argument("--timeout", type=int, default=180, help="HTTP timeout per call (seconds)")
-    p.add_argument("--retries", type=int, default=3, help="Retries on timeout/connect errors")
-    p.add_argument("--retry-backoff", type=float, default=1.5, help="Backoff multiplier between retries (seconds)")
+    p.add_argument("--retries", type=int, default=3, help="Retries on timeout/connect errors and 502/503/504")
+    p.add_argument("--retry-backoff", type=float, default=1.5, help="Backoff factor between retries (waits factor * 2^n seconds)")
     p.add_argument("--num-predict", type=int, default=300, help="Max tokens to generate per reply")
     p.add_argument("--history-window", type=int, default=10, help="Keep only this many most-recent user/assistant pairs per side")
+    p.add_argument("--summary-every", type=int, default=0,
+                   help="Every K replies per side, fold the oldest K exchanges into a rolling summary (0 = off)")
+    p.add_argument("--max-context-bytes", type=int, default=0,
+                   help="Also summarize whenever a side's history exceeds this many bytes of JSON (0 = off)")
+    p.add_argument("--keep-alive", default="30m", help="How long Ollama keeps each model loaded between turns")
+    p.add_argument("--num-ctx", type=int, default=0, help="Fixed context size in tokens (0 = server default)")
+    p.add_argument("--prewarm", action="store_true",
+                   help="Load both models and prefill their system prompts in parallel before the first turn")
+    p.add_argument("--cache", default="", metavar="FILE",
+                   help="SQLite file for replaying identical requests from disk (only temperature 0 calls unless --cache-all)")
+    p.add_argument("--cache-all", action="store_true", help="With --cache, also cache calls with temperature > 0")
     p.add_argument("--logfile", default="", help="Transcript path or directory. A unique filename is always created.")
     args = p.parse_args()
 
+    if args.cache and ResponseCache is None:
+        p.error("--cache needs llm_cache.py next to this script")
+    cache = ResponseCache(args.cache, cache_all=args.cache_all) if args.cache else None
+
+    # Pooled keep-alive connections, created once and reused for the whole run
+    pool_aihub = EndpointPool(split_urls(args.aihub_url), args.retries, args.retry_backoff)
+    pool_node01 = EndpointPool(split_urls(args.node01_url), args.retries, args.retry_backoff)
+
     # 1) Let user pick models
     try:
-        aihub_models = fetch_models(args.aihub_url)
-    except Exception as e:
+        aihub_models = pool_aihub.call(fetch_models)
+    except Exception as e:  # EndpointError once every URL failed
         print(f"[WARN] Could not list models on AIHub ({args.aihub_url}): {e}")
         aihub_models = []
     aihub_model = choose_from_list("AIHub models", aihub_models)
 
     try:
-        node01_models = fetch_models(args.node01_url)
-    except Exception as e:
+        node01_models = pool_node01.call(fetch_models)
+    except Exception as e:  # EndpointError once every URL failed
         print(f"[WARN] Could not list models on NODE01 ({args.node01_url}): {e}")
         node01_models = []
     node01_model = choose_from_list("NODE01 models", node01_models)
@@ -202,23 +569,28 @@ def main():
     seed = f"Start a friendly, curious conversation about: {topic}"
 
     # 3) Personas with explicit ban on model/AI talk
-    system_aihub = (
-        "You are Bob on AIHub. You're chatting with Jane on NODE01. "
-        "Speak naturally and conversationally. Do NOT mention model names, training, providers, parameters, "
-        "or that you are an AI/model/assistant. Avoid phrases like 'as a language model'. "
-        "Reply clearly in <= 150 words and end with a single direct question if it helps the conversation flow."
-    )
-    system_node01 = (
-        "You are Jane on NODE01. You're chatting with Bob on AIHub. "
-        "Speak naturally and conversationally. Do NOT mention model names, training, providers, parameters, "
-        "or that you are an AI/model/assistant. Avoid phrases like 'as a language model'. "
-        "Reply clearly in <= 150 words and end with a single direct question if it helps the conversation flow."
-    )
+    system_aihub = f"You are Bob on AIHub. You're chatting with Jane on NODE01. {PERSONA_COMMON}"
+    system_node01 = f"You are Jane on NODE01. You're chatting with Bob on AIHub. {PERSONA_COMMON}"
 
     history_aihub: List[Dict[str, str]] = [{"role": "system", "content": system_aihub}]
     history_node01: List[Dict[str, str]] = [{"role": "system", "content": system_node01}]
-    last_message = seed
-    speaker = "aihub"
+    bots: Dict[str, Dict[str, Any]] = {
+        "aihub": {"name": "Bob", "pool": pool_aihub, "model": aihub_model,
+                  "history": history_aihub, "encoder": MessageEncoder(), "peer": "node01", "replies": 0},
+        "node01": {"name": "Jane", "pool": pool_node01, "model": node01_model,
+                   "history": history_node01, "encoder": MessageEncoder(), "peer": "aihub", "replies": 0},
+    }
+
+    def dispatch(side: str, turn: int, message: str) -> Inflight:
+        """Relay `message` to `side` and start generating its reply for `turn` in the background."""
+        bot = bots[side]
+        remaining = args.turns - turn + 1  # includes this reply
+        bot["history"].extend(relay_with_wrap(bots[bot["peer"]]["name"], message, remaining))
+        trim_history(bot["history"], args.history_window)
+        print(f"[{bot['name']} / {bot['model']}]", flush=True)
+        return Inflight(bot["pool"].call, ollama_chat, bot["model"], list(bot["history"]),
+                        args.temperature, args.timeout, args.num_predict, on_chunk=print_chunk,
+                        keep_alive=args.keep_alive, num_ctx=args.num_ctx, encoder=bot["encoder"], cache=cache)
 
     # 4) Transcript path (always unique per run)
     logfile = uniquify_log_path(args.logfile, aihub_model, node01_model)
@@ -235,52 +607,66 @@ def main():
     print(f"Transcript: {logfile}")
     print("-------------------------------------------\n")
 
-    with open(logfile, "w", encoding="utf-8") as fp:
-        fp.write("Cross-chat Transcript\n")
-        fp.write("=" * 60 + "\n\n")
-        fp.write(f"Started: {datetime.datetime.now().isoformat(timespec='seconds')}\n")
-        fp.write(f"Bob (AIHub):  {args.aihub_url}  model={aihub_model}\n")
-        fp.write(f"Jane (NODE01): {args.node01_url}  model={node01_model}\n")
-        fp.write(f"Topic: {topic}\n\n")
-
+    with LogWriter(logfile) as fp:
+        fp.write(b"Cross-chat Transcript\n" + _HEADER_SEP + b"\n")
+        fp.write((f"Started: {datetime.datetime.now().isoformat(timespec='seconds')}\n"
+                  f"Bob (AIHub):  {args.aihub_url}  model={aihub_model}\n"
+                  f"Jane (NODE01): {args.node01_url}  model={node01_model}\n"
+                  f"Topic: {topic}\n\n").encode("utf-8"))
+
+        if args.prewarm:
+            # Jane's model loads on NODE01 while Bob is already generating on AIHub.
+            for bot in bots.values():
+                pool = bot["pool"]
+                Inflight(warm_model, pool.primary, bot["model"], bot["history"][0]["content"],
+                         args.keep_alive, args.num_ctx, args.timeout, pool.sessions[pool.primary])
+
+        # Replies are strictly ordered (each side answers the other's last message), so the
+        # overlap available is one turn deep: the next reply is dispatched as soon as this
+        # one arrives, and logging this turn runs while the peer is generating. Replies are
+        # printed live as they stream in, so only the closing blank line is printed here.
+        speaker = "aihub"
+        pending = dispatch(speaker, 1, seed)
+        next_dispatch = time.monotonic() + args.delay
         for turn in range(1, args.turns + 1):
-            remaining = args.turns - turn + 1  # includes current reply
-
-            if speaker == "aihub":
-                history_aihub.append({
-                    "role": "user",
-                    "content": relay_with_wrap("Jane", last_message, remaining)
-                })
-                history_aihub = trim_history(history_aihub, args.history_window)
-                reply = ollama_chat(args.aihub_url, aihub_model, history_aihub,
-                                    args.temperature, args.timeout, args.retries, args.retry_backoff,
-                                    args.num_predict)
-                reply = clean(reply)
-                history_aihub.append({"role": "assistant", "content": reply})
-                print(f"[Bob / {aihub_model}]\n{reply}\n")
-                log_line(fp, "Bob", aihub_model, reply, turn)
-                last_message = reply
-                speaker = "node01"
-            else:
-                history_node01.append({
-                    "role": "user",
-                    "content": relay_with_wrap("Bob", last_message, remaining)
-                })
-                history_node01 = trim_history(history_node01, args.history_window)
-                reply = ollama_chat(args.node01_url, node01_model, history_node01,
-                                    args.temperature, args.timeout, args.retries, args.retry_backoff,
-                                    args.num_predict)
-                reply = clean(reply)
-                history_node01.append({"role": "assistant", "content": reply})
-                print(f"[Jane / {node01_model}]\n{reply}\n")
-                log_line(fp, "Jane", node01_model, reply, turn)
-                last_message = reply
-                speaker = "aihub"
-
-            time.sleep(args.delay)
-
-        fp.write("=== End of conversation ===\n")
-        fp.write(f"Finished: {datetime.datetime.now().isoformat(timespec='seconds')}\n")
+            bot = bots[speaker]
+            try:
+                reply = clean(pending.result())
+            except EndpointError as e:  # every endpoint for this bot failed
+                raise SystemExit(f"[ERROR] {e}")
+            print("\n")
+            bot["history"].append({"role": "assistant", "content": reply})
+            speaker = bot["peer"]
+
+            if turn < args.turns:
+                # --delay spaces out dispatches instead of being added after each reply, so
+                # a turn takes max(generation, delay) rather than generation + delay.
+                wait = next_dispatch - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                pending = dispatch(speaker, turn + 1, reply)
+                next_dispatch = time.monotonic() + args.delay
+
+            log_line(fp, bot["name"], bot["model"], reply, turn)
+
+            # Runs while the peer's next reply is generating.
+            bot["replies"] += 1
+            due = args.summary_every > 0 and bot["replies"] % args.summary_every == 0
+            if not due and args.max_context_bytes > 0:
+                due = len(bot["encoder"].encode(bot["history"])) > args.max_context_bytes
+            if due and turn + 2 <= args.turns:  # this bot speaks again at turn + 2
+                try:
+                    summarize_history(bot["pool"], bot["model"], bot["history"],
+                                      args.summary_every or max(1, args.history_window // 2),
+                                      bot["name"], args.timeout, args.keep_alive, args.num_ctx)
+                except EndpointError as e:
+                    raise SystemExit(f"[ERROR] {e}")
+
+        fp.write(b"=== End of conversation ===\n")
+        fp.write(f"Finished: {datetime.datetime.now().isoformat(timespec='seconds')}\n".encode("utf-8"))
+
+    if cache is not None:
+        cache.close()
 
     print("=== Cross-chat complete ===\n")
 
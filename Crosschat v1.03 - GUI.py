@@ -1,33 +1,64 @@
 #!/usr/bin/env python3
 # CrosschatGUI.py
-import sys, os, re, time, datetime, threading, queue, traceback, json
-from typing import List, Dict, Any, Optional
+import sys, os, re, time, datetime, threading, queue, traceback, json, functools
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, simpledialog
+from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 
 # ---- deps ----
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     messagebox.showerror("Missing dependency",
                          "This app requires the 'requests' package.\n\nInstall with:\n    pip install requests")
     sys.exit(1)
 
+# Optional: llm_cache.py (kept next to this script) adds the in-memory reply cache
+try:
+    from llm_cache import MemoryCache, cache_key
+except ImportError:
+    MemoryCache = cache_key = None
+
+# Optional: orjson encodes/decodes JSON several times faster (pip install orjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # =========================
 # Core chat logic (from your CLI version)
 # =========================
 
 _PREFIX = re.compile(r"^\s*(thoughtful\s*question\s*:)\s*", re.I)
-INVALID_CHARS = re.compile(r'[<>:"/\\|?*]')  # Windows-invalid filename chars
+_INVALID_TABLE = str.maketrans({c: "_" for c in '<>:"/\\|?*'})  # Windows-invalid filename chars
+_RE_QUESTIONS = re.compile(r'\?+')
+_RE_SIGN_OFF = re.compile(r'\b(thanks|thank you|cheers|goodbye|see you)\b', re.I)
 MANUAL_SENTINEL = "Manual model…"
 
+def dumps_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+@functools.lru_cache(maxsize=1024)
 def clean(text: str) -> str:
+    # Fast path: most replies don't start with the prefix, so skip the regex.
+    if text.lstrip()[:10].lower() != "thoughtful":
+        return text.strip()
     return _PREFIX.sub("", text).strip()
 
 def sanitize_filename(s: str) -> str:
-    s = INVALID_CHARS.sub("_", s).strip().strip(".")
+    s = s.translate(_INVALID_TABLE).strip().strip(".")
     return s
 
 def timestamp() -> str:
@@ -35,8 +66,8 @@ def timestamp() -> str:
 
 def default_logname(aihub_model: str, node01_model: str) -> str:
     ts = timestamp()
-    safe_a = sanitize_filename(aihub_model.replace("/", "_"))
-    safe_n = sanitize_filename(node01_model.replace("/", "_"))
+    safe_a = sanitize_filename(aihub_model)
+    safe_n = sanitize_filename(node01_model)
     return f"crosschat_{safe_a}__{safe_n}_{ts}.txt"
 
 def looks_like_dir_path(path: str) -> bool:
@@ -50,26 +81,38 @@ def uniquify_log_path(path: str, aihub_model: str, node01_model: str) -> str:
     base, ext = os.path.splitext(path)
     return f"{base}_{timestamp()}{ext or '.txt'}"
 
-def fetch_models(base_url: str, timeout: int = 15) -> List[str]:
+def make_session() -> requests.Session:
+    # Keep-alive pool for one endpoint: chat turns, fetches and pulls reuse its connections.
+    # Retries stay in ollama_chat, so the adapter has none.
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+def fetch_models(base_url: str, timeout: int = 15, session: Optional[requests.Session] = None,
+                 cache: Optional[Dict[str, Tuple[str, List[str]]]] = None) -> List[str]:
+    # cache maps tags URL -> (ETag, models). When the server sent an ETag, the next fetch is
+    # conditional and a 304 reuses the stored list instead of downloading it again.
     url = base_url.rstrip("/") + "/api/tags"
-    r = requests.get(url, timeout=timeout)
+    headers = {}
+    cached = cache.get(url) if cache is not None else None
+    if cached and cached[0]:
+        headers["If-None-Match"] = cached[0]
+    r = (session or requests).get(url, headers=headers, timeout=timeout)
+    if r.status_code == 304 and cached:
+        return list(cached[1])
     r.raise_for_status()
-    data = r.json()
+    data = loads(r.content)  # Ollama always sends UTF-8; skips requests' charset detection
     models = []
     for m in data.get("models", []):
         name = m.get("name") or m.get("model")
         if name:
             models.append(name)
-    return sorted(models)
-
-def trim_history(history: List[Dict[str, str]], keep_pairs: int) -> List[Dict[str, str]]:
-    if keep_pairs is None:
-        return history
-    if keep_pairs <= 0:
-        return history[:1]
-    head = history[:1]
-    tail = history[1:][-2 * keep_pairs:]
-    return head + tail
+    models.sort()
+    if cache is not None:
+        cache[url] = (r.headers.get("ETag", ""), models)
+    return list(models)
 
 def relay_with_wrap(from_name: str, last_message: str, remaining_turns: int) -> str:
     cue = ""
@@ -81,70 +124,217 @@ def relay_with_wrap(from_name: str, last_message: str, remaining_turns: int) ->
                "Thank them and say goodbye. No new topics.]")
     return f"From {from_name}: {last_message}{cue}"
 
+@functools.lru_cache(maxsize=512)
 def enforce_wrap_rules(text: str, remaining: int) -> str:
     # For last two turns, strip questions; for final turn, ensure a thanks/goodbye.
     if remaining <= 2:
-        text = re.sub(r'\?+', '.', text).strip()
-        if remaining == 1 and not re.search(r'\b(thanks|thank you|cheers|goodbye|see you)\b', text, re.I):
+        text = _RE_QUESTIONS.sub('.', text).strip()
+        if remaining == 1 and not _RE_SIGN_OFF.search(text):
             text = (text.rstrip('. ') + ". Thanks for the chat. Goodbye.").strip()
     return text
 
+class MessageEncoder:
+    """
+    Serialises one bot's message list for /api/chat. Each message (the pinned system prompt
+    included) is encoded once and its bytes reused while it stays in the history window, so
+    a turn only encodes the new messages. Messages must not be mutated once added.
+    """
+    def __init__(self):
+        self._cache: Dict[int, Tuple[Dict[str, str], bytes]] = {}
+
+    def encode(self, messages: List[Dict[str, str]]) -> bytes:
+        cache: Dict[int, Tuple[Dict[str, str], bytes]] = {}
+        parts = []
+        for m in messages:
+            hit = self._cache.get(id(m))
+            if hit is None or hit[0] is not m:
+                hit = (m, dumps_bytes(m))
+            cache[id(m)] = hit
+            parts.append(hit[1])
+        self._cache = cache  # drops messages that fell out of the window
+        return b"[" + b",".join(parts) + b"]"
+
+class ChatCancelled(Exception):
+    """Raised inside a chat call when the user pressed Stop."""
+
 def ollama_chat(base_url: str, model: str, messages: List[Dict[str, str]],
                 temperature: float, timeout: int, retries: int, backoff: float,
-                num_predict: int) -> str:
+                num_predict: int, session: Optional[requests.Session] = None,
+                cancel: Optional[threading.Event] = None,
+                on_chunk: Optional[Callable[[str], None]] = None,
+                cache: "Optional[MemoryCache]" = None,
+                encoder: Optional[MessageEncoder] = None) -> str:
+    # Streams the reply (NDJSON frames) and returns the full text; on_chunk gets each piece
+    # as it arrives so the console can show it live.
+    # With a cache, a repeat of a cacheable request (temperature 0 by default) is answered
+    # from it without calling Ollama.
+    # Pass the bot's MessageEncoder so history messages are only serialised once per run.
+    # `cancel` (the GUI's stop event) interrupts retry backoff instead of sleeping it out,
+    # and is checked between frames so Stop doesn't wait for the rest of the reply.
+    key = None
+    if cache is not None and cache.cacheable(temperature):
+        key = cache_key(model, messages, temperature, num_predict)
+        hit = cache.get(key)
+        if hit is not None:
+            if on_chunk:
+                on_chunk(hit)
+            return hit
+
     url = base_url.rstrip('/') + "/api/chat"
     payload: Dict[str, Any] = {
         "model": model,
-        "messages": messages,
-        "stream": False,
+        "stream": True,
         "options": {
             "temperature": temperature,
             "num_predict": num_predict
         },
     }
+    body = dumps_bytes(payload)[:-1] + b',"messages":' + (encoder or MessageEncoder()).encode(messages) + b"}"
     attempt = 0
     while True:
         attempt += 1
         try:
-            r = requests.post(url, json=payload, timeout=timeout)
+            r = (session or requests).post(url, data=body, headers={"Content-Type": "application/json"},
+                                           stream=True, timeout=timeout)
             r.raise_for_status()
-            data = r.json()
-            content = (data.get("message", {}) or {}).get("content", "").strip()
-            return content
+            break
         except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout) as e:
             if attempt <= retries:
                 wait = backoff * attempt
-                time.sleep(wait)
+                if cancel is not None:
+                    if cancel.wait(wait):
+                        raise ChatCancelled() from e
+                else:
+                    time.sleep(wait)
                 continue
             raise RuntimeError(f"Timeout calling {url} after {retries} retries: {e}") from e
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"HTTP error calling {url}: {e}") from e
 
-def log_line(fp, who: str, model: str, text: str, turn: int):
-    fp.write(f"Turn {turn} - {who} ({model})\n")
-    fp.write("-" * 60 + "\n")
-    fp.write(text.strip() + "\n\n")
-    fp.flush()
+    parts: List[str] = []
+    try:
+        with r:
+            # Read to the end of the body rather than stopping at the done frame, so urllib3
+            # puts the connection back in the session's pool; only a cancelled reply closes it.
+            for raw in r.iter_lines():
+                if cancel is not None and cancel.is_set():
+                    raise ChatCancelled()
+                if not raw:
+                    continue
+                frame = loads(raw)
+                if frame.get("error"):
+                    raise RuntimeError(f"{url} returned an error: {frame['error']}")
+                chunk = (frame.get("message", {}) or {}).get("content", "")
+                if chunk:
+                    parts.append(chunk)
+                    if on_chunk:
+                        on_chunk(chunk)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        raise RuntimeError(f"Reply stream from {url} broke off: {e}") from e
+    content = "".join(parts).strip()
+    if key is not None:
+        cache.put(key, content)
+    return content
+
+class Inflight:
+    """
+    Runs fn(*args, **kwargs) on a daemon thread so the chat worker can carry on while a
+    reply generates; a call stuck in model load can't keep the app alive after the window
+    closes. result() waits for it and re-raises anything the call raised.
+    """
+    def __init__(self, fn, *args, **kwargs):
+        self._value: Any = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(fn, args, kwargs), daemon=True)
+        self._thread.start()
+
+    def _run(self, fn, args, kwargs):
+        try:
+            self._value = fn(*args, **kwargs)
+        except BaseException as e:
+            self._error = e
+
+    def result(self) -> Any:
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+class LogWriter:
+    """
+    Transcript file written by a background thread: write() only enqueues the text, so the
+    chat worker never waits on disk. The file is flushed whenever the queue runs empty
+    (so it stays current while a run is in progress) and on close(), which drains the
+    queue, joins the thread and re-raises the first write error, if any.
+    """
+    def __init__(self, path: str):
+        self._fp = open(path, "w", encoding="utf-8", buffering=1 << 16)
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._error: Optional[OSError] = None
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def write(self, text: str):
+        if self._error is None:  # after a failed write nothing is drained any more
+            self._queue.put(text)
+
+    def _drain(self):
+        try:
+            while True:
+                text = self._queue.get()
+                if text is None:
+                    break
+                self._fp.write(text)
+                if self._queue.empty():
+                    self._fp.flush()
+        except OSError as e:
+            self._error = e
+        finally:
+            try:
+                self._fp.close()
+            except OSError as e:
+                self._error = self._error or e
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "LogWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            self.close()
+        except OSError:
+            if exc_type is None:
+                raise  # otherwise keep the exception already on its way out
+
+def log_line(fp: LogWriter, who: str, model: str, text: str, turn: int):
+    fp.write(f"Turn {turn} - {who} ({model})\n" + "-" * 60 + "\n" + text.strip() + "\n\n")
 
 # ---- Pull (download) models with streamed progress ----
-def pull_model_stream(base_url: str, model: str, timeout: int = 3600):
+def pull_model_stream(base_url: str, model: str, timeout: int = 3600,
+                      session: Optional[requests.Session] = None):
     """
     Generator that yields progress strings while pulling a model via Ollama.
     Uses /api/pull which streams NDJSON lines like {"status":"pulling","completed":...,"total":...}
     """
     url = base_url.rstrip("/") + "/api/pull"
     try:
-        r = requests.post(url, json={"name": model}, stream=True, timeout=timeout)
+        r = (session or requests).post(url, json={"name": model}, stream=True, timeout=timeout)
         r.raise_for_status()
     except requests.RequestException as e:
         yield f"[ERROR] Pull request failed: {e}"
         return
 
-    for raw in r.iter_lines(decode_unicode=True):
+    # Raw bytes: loads() takes them directly, so lines are only decoded for the fallback.
+    for raw in r.iter_lines():
         if not raw:
             continue
         try:
-            data = json.loads(raw)
+            data = loads(raw)
             status = data.get("status", "")
             completed = data.get("completed")
             total = data.get("total")
@@ -155,7 +345,7 @@ def pull_model_stream(base_url: str, model: str, timeout: int = 3600):
                 if status:
                     yield status
         except Exception:
-            yield raw  # fallback: raw line
+            yield raw.decode("utf-8", "replace")  # fallback: raw line
 
 # =========================
 # GUI
@@ -163,6 +353,60 @@ def pull_model_stream(base_url: str, model: str, timeout: int = 3600):
 
 APP_TITLE = "AI Cross-Chat (Bob ↔ Jane)"
 DEFAULT_TOPIC = "Discuss whether our universe could reside inside a black hole—pros, cons, and implications."
+# Console soft cap: past CONSOLE_MAX_LINES the oldest lines are dropped down to CONSOLE_KEEP_LINES,
+# so long runs don't slow Tk's redraws. The full conversation is in the transcript file.
+CONSOLE_MAX_LINES = 5000
+CONSOLE_KEEP_LINES = 4000
+# Slow safety-net drain for when a worker can't wake the UI (Tcl built without threads,
+# or posted before the main loop started).
+UI_FALLBACK_MS = 500
+PROGRESS_INTERVAL = 0.05  # seconds; pull progress reaches the console at most ~20 times a second
+
+class _AsyncAskString(tk.Toplevel):
+    """
+    Small modal prompt for one line of text. Unlike simpledialog.askstring it returns at
+    once and reports through callback(text) on OK, or callback(None) on Cancel / close, so
+    the caller never sits in a nested wait_window loop while progress is streaming.
+    """
+    def __init__(self, master, title: str, prompt: str, callback: Callable[[Optional[str]], None]):
+        super().__init__(master)
+        self.title(title)
+        self.transient(master.winfo_toplevel())
+        self.resizable(False, False)
+        self._callback = callback
+
+        frm = ttk.Frame(self, padding=12)
+        frm.pack(fill="both", expand=True)
+        ttk.Label(frm, text=prompt).pack(anchor="w")
+        self._entry = ttk.Entry(frm, width=48)
+        self._entry.pack(fill="x", pady=(6, 10))
+        btns = ttk.Frame(frm)
+        btns.pack(anchor="e")
+        ttk.Button(btns, text="OK", command=self._ok).pack(side="left")
+        ttk.Button(btns, text="Cancel", command=self._cancel).pack(side="left", padx=(6, 0))
+
+        self.bind("<Return>", lambda e: self._ok())
+        self.bind("<Escape>", lambda e: self._cancel())
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+        self._entry.focus_set()
+        # Modal like askstring (one prompt at a time, main window blocked), but through a
+        # grab rather than a nested wait_window loop.
+        self._grab()
+
+    def _grab(self):
+        try:
+            self.grab_set()
+        except tk.TclError:
+            self.after(50, self._grab)  # some window managers haven't mapped it yet
+
+    def _ok(self):
+        text = self._entry.get()
+        self.destroy()
+        self._callback(text)
+
+    def _cancel(self):
+        self.destroy()
+        self._callback(None)
 
 class CrossChatGUI(ttk.Frame):
     def __init__(self, master):
@@ -175,6 +419,15 @@ class CrossChatGUI(ttk.Frame):
         self.worker_thread: Optional[threading.Thread] = None
         self.stop_event = threading.Event()
         self.ui_queue = queue.Queue()
+        self._sessions: Dict[str, requests.Session] = {}  # base URL -> pooled keep-alive session
+        self._prewarmed: set = set()  # base URLs whose connection has already been opened
+        # temperature-0 replies, reused on reruns (None without llm_cache.py)
+        self._reply_cache = MemoryCache(maxsize=256) if MemoryCache is not None else None
+        self._tags_cache: Dict[str, Tuple[str, List[str]]] = {}  # tags URL -> (ETag, models)
+        # Fetches, pulls and prewarms share these threads instead of starting one per click.
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="crosschat-io")
+        self._closing = threading.Event()
+        self.master.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # --- styles
         style = ttk.Style()
@@ -210,8 +463,9 @@ class CrossChatGUI(ttk.Frame):
         # disable Start until ready
         self._update_start_state()
 
-        # periodic UI updates from worker threads
-        self.after(100, self._poll_ui_queue)
+        # UI updates from worker threads: _post() queues them and wakes the Tk loop
+        self.bind("<<UIQueue>>", lambda e: self._drain_ui_queue())
+        self.after(UI_FALLBACK_MS, self._fallback_drain)
 
     # ---------- UI builders ----------
     def _build_top_form(self):
@@ -303,6 +557,16 @@ class CrossChatGUI(ttk.Frame):
         ttk.Button(tfrm, text="Choose folder…", command=self._choose_log_path).grid(row=0, column=2, sticky="w")
         tfrm.columnconfigure(1, weight=1)
 
+        # name -> var, read in one pass by _snapshot()
+        self._vars: Dict[str, tk.StringVar] = {
+            "aihub_url": self.aihub_url_var, "node01_url": self.node01_url_var,
+            "aihub_model": self.aihub_model_var, "node01_model": self.node01_model_var,
+            "turns": self.turns_var, "temperature": self.temperature_var, "delay": self.delay_var,
+            "timeout": self.timeout_var, "retries": self.retries_var, "backoff": self.backoff_var,
+            "num_predict": self.num_predict_var, "history_window": self.history_window_var,
+            "log_path": self.log_path_var,
+        }
+
     def _build_run_area(self):
         rfrm = ttk.Frame(self)
         rfrm.pack(fill="x", padx=12, pady=(10,6))
@@ -326,11 +590,33 @@ class CrossChatGUI(ttk.Frame):
 
     # ---------- helpers ----------
     def _append_console(self, text: str):
+        if self.console.get("end-2c") not in ("\n", ""):
+            text = "\n" + text  # a reply cut off mid-stream (Stop / error) has no newline yet
+        self._insert_console(text + "\n")
+
+    def _insert_console(self, text: str):
         self.console.configure(state="normal")
-        self.console.insert("end", text + "\n")
+        self.console.insert("end", text)
+        lines = int(self.console.index("end-1c").split(".")[0])
+        if lines > CONSOLE_MAX_LINES:
+            self.console.delete("1.0", f"{lines - CONSOLE_KEEP_LINES}.0")
         self.console.see("end")
         self.console.configure(state="disabled")
 
+    def _replace_stream(self, text: str):
+        self.console.configure(state="normal")
+        self.console.delete("stream_start", "end-1c")
+        self.console.insert("end", text)
+        self.console.see("end")
+        self.console.configure(state="disabled")
+
+    def _session_for(self, url: str) -> requests.Session:
+        # Called on the UI thread only; workers just receive the session.
+        key = url.strip().rstrip("/")
+        if key not in self._sessions:
+            self._sessions[key] = make_session()
+        return self._sessions[key]
+
     def _set_status(self, msg: str):
         self.status_var.set(msg)
 
@@ -342,20 +628,47 @@ class CrossChatGUI(ttk.Frame):
         self._update_start_state()
 
     # ---------- start/stop ----------
-    def _models_ready(self) -> bool:
+    def _snapshot(self, *keys: str) -> Dict[str, str]:
+        # One stripped read of the named form fields (all of them if none are named), so
+        # callers don't go back to Tcl per value or read fields they don't use.
+        return {k: self._vars[k].get().strip() for k in (keys or self._vars)}
+
+    def _models_ready(self, snap: Dict[str, str]) -> bool:
         return (
-            self.aihub_model_var.get().strip() not in ("", "Select a model…", MANUAL_SENTINEL) and
-            self.node01_model_var.get().strip() not in ("", "Select a model…", MANUAL_SENTINEL)
+            snap["aihub_model"] not in ("", "Select a model…", MANUAL_SENTINEL) and
+            snap["node01_model"] not in ("", "Select a model…", MANUAL_SENTINEL)
         )
 
     def _update_start_state(self):
+        snap = self._snapshot("aihub_url", "node01_url", "aihub_model", "node01_model")
+        aihub_url = snap["aihub_url"]
+        node01_url = snap["node01_url"]
+        if aihub_url and node01_url:
+            self._prewarm_endpoints(aihub_url, node01_url)
         can_start = all([
-            bool(self.aihub_url_var.get().strip()),
-            bool(self.node01_url_var.get().strip()),
-            self._models_ready()
+            bool(aihub_url),
+            bool(node01_url),
+            self._models_ready(snap)
         ])
         self.start_btn.configure(state=("normal" if can_start else "disabled"))
 
+    def _prewarm_endpoints(self, *urls: str):
+        # Open each endpoint's pooled connection in the background so the first fetch or
+        # turn doesn't pay the handshake. Once per URL; failures are ignored.
+        for url in urls:
+            key = url.rstrip("/")
+            if key in self._prewarmed:
+                continue
+            self._prewarmed.add(key)
+            session = self._session_for(url)
+
+            def work(session=session, url=key):
+                try:
+                    session.head(url + "/", timeout=5)
+                except requests.RequestException:
+                    pass
+            self._io_pool.submit(work)
+
     # ---------- model fetch/pull ----------
     def _fetch_aihub_models(self):
         self._fetch_models(self.aihub_url_var.get(), self.aihub_model_cb, "AIHub")
@@ -364,27 +677,29 @@ class CrossChatGUI(ttk.Frame):
         self._fetch_models(self.node01_url_var.get(), self.node01_model_cb, "NODE01")
 
     def _fetch_models(self, url: str, target_cb: ttk.Combobox, label: str):
+        session = self._session_for(url)
+
         def work():
             try:
-                models = fetch_models(url, timeout=15)
+                models = fetch_models(url, timeout=15, session=session, cache=self._tags_cache)
                 models = [MANUAL_SENTINEL] + models
-                self.ui_queue.put(("models", (target_cb, models, label)))
+                self._post("models", (target_cb, models, label))
             except Exception as e:
-                self.ui_queue.put(("error", f"Failed to fetch {label} models: {e}"))
-        threading.Thread(target=work, daemon=True).start()
+                self._post("error", f"Failed to fetch {label} models: {e}")
+        self._io_pool.submit(work)
         self._set_status(f"Fetching {label} models...")
 
     def _handle_model_select(self, side: str):
         if side == "aihub":
-            if self.aihub_model_var.get() == MANUAL_SENTINEL:
-                tag = simpledialog.askstring("Manual model", "Enter model tag for Bob (AIHub), e.g. granite3.1-moe:1b")
-                if tag:
-                    self.aihub_model_var.set(tag.strip())
+            var, prompt = self.aihub_model_var, "Enter model tag for Bob (AIHub), e.g. granite3.1-moe:1b"
         else:
-            if self.node01_model_var.get() == MANUAL_SENTINEL:
-                tag = simpledialog.askstring("Manual model", "Enter model tag for Jane (NODE01), e.g. llama3.2:1b")
-                if tag:
-                    self.node01_model_var.set(tag.strip())
+            var, prompt = self.node01_model_var, "Enter model tag for Jane (NODE01), e.g. llama3.2:1b"
+        if var.get() == MANUAL_SENTINEL:
+            def on_tag(tag: Optional[str]):
+                if tag and tag.strip():
+                    var.set(tag.strip())
+                self._update_start_state()
+            _AsyncAskString(self, "Manual model", prompt, on_tag)
         self._update_start_state()
 
     def _pull_aihub_model(self):
@@ -394,44 +709,66 @@ class CrossChatGUI(ttk.Frame):
         self._pull_model_generic("NODE01", self.node01_url_var.get(), self.node01_model_var, self.node01_model_cb)
 
     def _pull_model_generic(self, label: str, base_url: str, model_var: tk.StringVar, cb: ttk.Combobox):
-        model = simpledialog.askstring(f"Download to {label}",
-                                       f"Enter model tag to download to {label} (e.g. llama3.2:1b):")
-        if not model:
+        _AsyncAskString(self, f"Download to {label}",
+                        f"Enter model tag to download to {label} (e.g. llama3.2:1b):",
+                        lambda model: self._start_pull(label, base_url, cb, model))
+
+    def _start_pull(self, label: str, base_url: str, cb: ttk.Combobox, model: Optional[str]):
+        if not model or not model.strip():
+            return
+        if self.worker_thread is not None and self.worker_thread.is_alive():
+            self._set_status("A chat is running; download not started.")
             return
         model = model.strip()
         self._append_console(f"Starting download on {label}: {model}")
         self._set_status(f"Downloading {model} to {label}…")
+        session = self._session_for(base_url)
 
         def work():
             try:
-                for msg in pull_model_stream(base_url, model):
-                    self.ui_queue.put(("progress", f"[{label}] {msg}"))
-                models = fetch_models(base_url, timeout=15)
+                # Ollama reports progress many times a second; lines that arrive within
+                # PROGRESS_INTERVAL of the last one shown are dropped, except the final one.
+                last_put = 0.0
+                held: Optional[str] = None
+                for msg in pull_model_stream(base_url, model, session=session):
+                    if self._closing.is_set():
+                        return  # window closed; don't keep the process alive for the download
+                    now = time.monotonic()
+                    if now - last_put >= PROGRESS_INTERVAL:
+                        self._post("progress", f"[{label}] {msg}")
+                        last_put = now
+                        held = None
+                    else:
+                        held = msg
+                if held is not None:
+                    self._post("progress", f"[{label}] {held}")
+                models = fetch_models(base_url, timeout=15, session=session, cache=self._tags_cache)
                 models = [MANUAL_SENTINEL] + models
-                self.ui_queue.put(("models-select", (cb, models, label, model)))
-                self.ui_queue.put(("info", f"[{label}] Download finished: {model}"))
+                self._post("models-select", (cb, models, label, model))
+                self._post("info", f"[{label}] Download finished: {model}")
             except Exception as e:
-                self.ui_queue.put(("error", f"Download failed on {label}: {e}"))
+                self._post("error", f"Download failed on {label}: {e}")
 
-        threading.Thread(target=work, daemon=True).start()
+        self._io_pool.submit(work)
 
     # ---------- run/stop ----------
     def _start_chat(self):
         try:
-            aihub_url = self.aihub_url_var.get().strip()
-            node01_url = self.node01_url_var.get().strip()
-            aihub_model = self.aihub_model_var.get().strip()
-            node01_model = self.node01_model_var.get().strip()
+            snap = self._snapshot()
+            aihub_url = snap["aihub_url"]
+            node01_url = snap["node01_url"]
+            aihub_model = snap["aihub_model"]
+            node01_model = snap["node01_model"]
             topic = self.topic_text.get("1.0", "end").strip()
-            turns = int(self.turns_var.get().strip() or "50")
-            temperature = float(self.temperature_var.get().strip() or "0.7")
-            delay = float(self.delay_var.get().strip() or "0.4")
-            timeout = int(self.timeout_var.get().strip() or "180")
-            retries = int(self.retries_var.get().strip() or "3")
-            backoff = float(self.backoff_var.get().strip() or "1.5")
-            num_predict = int(self.num_predict_var.get().strip() or "300")
-            history_window = int(self.history_window_var.get().strip() or "10")
-            log_dir = self.log_path_var.get().strip() or "."
+            turns = int(snap["turns"] or "50")
+            temperature = float(snap["temperature"] or "0.7")
+            delay = float(snap["delay"] or "0.4")
+            timeout = int(snap["timeout"] or "180")
+            retries = int(snap["retries"] or "3")
+            backoff = float(snap["backoff"] or "1.5")
+            num_predict = int(snap["num_predict"] or "300")
+            history_window = int(snap["history_window"] or "10")
+            log_dir = snap["log_path"] or "."
 
             if not aihub_url or not node01_url:
                 messagebox.showerror("Missing URLs", "Please provide both AIHub URL and NODE01 URL.")
@@ -442,9 +779,6 @@ class CrossChatGUI(ttk.Frame):
             if not topic:
                 topic = DEFAULT_TOPIC
 
-            os.makedirs(log_dir, exist_ok=True)
-            logfile = os.path.join(log_dir, default_logname(aihub_model, node01_model))
-
             for w in (self.start_btn, self.fetch_aihub_btn, self.fetch_node_btn,
                       self.aihub_model_cb, self.node01_model_cb,
                       self.pull_aihub_btn, self.pull_node_btn):
@@ -456,7 +790,7 @@ class CrossChatGUI(ttk.Frame):
                 f"=== Cross-chat starting ===\n"
                 f"Bob (AIHub):  {aihub_url}  model={aihub_model}\n"
                 f"Jane (NODE01): {node01_url}  model={node01_model}\n"
-                f"Topic: {topic}\nTranscript: {logfile}\n-------------------------------------------"
+                f"Topic: {topic}"
             )
 
             self.stop_event.clear()
@@ -466,7 +800,9 @@ class CrossChatGUI(ttk.Frame):
                 topic=topic, turns=turns, temperature=temperature, delay=delay,
                 timeout=timeout, retries=retries, backoff=backoff,
                 num_predict=num_predict, history_window=history_window,
-                logfile=logfile
+                log_dir=log_dir,
+                aihub_session=self._session_for(aihub_url), node01_session=self._session_for(node01_url),
+                reply_cache=self._reply_cache
             )
             self.worker_thread = threading.Thread(target=self._run_chat_worker, args=(args,), daemon=True)
             self.worker_thread.start()
@@ -478,6 +814,16 @@ class CrossChatGUI(ttk.Frame):
         self._set_status("Stopping…")
 
     def _run_chat_worker(self, cfg: Dict[str, Any]):
+        # The transcript folder is created here rather than in _start_chat, so a slow
+        # (e.g. network) folder doesn't hold up the UI thread.
+        try:
+            os.makedirs(cfg["log_dir"], exist_ok=True)
+        except OSError as e:
+            self._post("error", f"Cannot create transcript folder {cfg['log_dir']}: {e}")
+            return
+        logfile = os.path.join(cfg["log_dir"], default_logname(cfg["aihub_model"], cfg["node01_model"]))
+        self._post("info", f"Transcript: {logfile}\n-------------------------------------------")
+
         try:
             seed = f"Start a friendly, curious conversation about: {cfg['topic']}"
 
@@ -494,12 +840,37 @@ class CrossChatGUI(ttk.Frame):
                 "Reply clearly in <= 150 words and end with a single direct question if it helps the conversation flow."
             )
 
-            history_aihub: List[Dict[str, str]] = [{"role": "system", "content": system_aihub}]
-            history_node01: List[Dict[str, str]] = [{"role": "system", "content": system_node01}]
-            last_message = seed
-            speaker = "aihub"
-
-            with open(cfg["logfile"], "w", encoding="utf-8") as fp:
+            # Only the last history_window exchanges are sent; the deque drops older ones as
+            # new messages arrive and the system prompt is prepended at send time.
+            window = 2 * max(0, cfg["history_window"])
+            bots: Dict[str, Dict[str, Any]] = {
+                "aihub": {"name": "Bob", "peer": "node01", "url": cfg["aihub_url"],
+                          "model": cfg["aihub_model"], "session": cfg["aihub_session"],
+                          "system": {"role": "system", "content": system_aihub},
+                          "history": deque(maxlen=window), "encoder": MessageEncoder()},
+                "node01": {"name": "Jane", "peer": "aihub", "url": cfg["node01_url"],
+                           "model": cfg["node01_model"], "session": cfg["node01_session"],
+                           "system": {"role": "system", "content": system_node01},
+                           "history": deque(maxlen=window), "encoder": MessageEncoder()},
+            }
+
+            def dispatch(side: str, turn: int, message: str) -> Inflight:
+                # Relay `message` to `side` and start generating its reply for `turn`.
+                bot = bots[side]
+                remaining = cfg["turns"] - turn + 1
+                self._post("turns_left", f"Turns left: {remaining}")
+                bot["history"].append({"role": "user",
+                                       "content": relay_with_wrap(bots[bot["peer"]]["name"], message, remaining)})
+                self._post("say_start", (bot["name"], bot["model"]))
+                name = bot["name"]
+                return Inflight(
+                    ollama_chat, bot["url"], bot["model"], [bot["system"], *bot["history"]],
+                    cfg["temperature"], cfg["timeout"], cfg["retries"], cfg["backoff"],
+                    cfg["num_predict"], bot["session"], self.stop_event,
+                    lambda c: self._post("stream_chunk", (name, c)),
+                    cfg["reply_cache"], bot["encoder"])
+
+            with LogWriter(logfile) as fp:
                 fp.write("Cross-chat Transcript\n")
                 fp.write("=" * 60 + "\n\n")
                 fp.write(f"Started: {datetime.datetime.now().isoformat(timespec='seconds')}\n")
@@ -507,56 +878,80 @@ class CrossChatGUI(ttk.Frame):
                 fp.write(f"Jane (NODE01): {cfg['node01_url']}  model={cfg['node01_model']}\n")
                 fp.write(f"Topic: {cfg['topic']}\n\n")
 
+                # Replies are strictly ordered, so the overlap available is one turn deep:
+                # the next reply is dispatched as soon as this one is cleaned up, and the
+                # transcript write for this turn happens while the peer is generating.
+                speaker = "aihub"
+                pending = dispatch(speaker, 1, seed)
+                next_dispatch = time.monotonic() + cfg["delay"]
                 for turn in range(1, cfg["turns"] + 1):
-                    remaining = cfg["turns"] - turn + 1
-                    self.ui_queue.put(("turns_left", f"Turns left: {remaining}"))
-
-                    if self.stop_event.is_set():
-                        self.ui_queue.put(("info", "Stopped by user."))
+                    bot = bots[speaker]
+                    try:
+                        reply = clean(pending.result())
+                    except ChatCancelled:
+                        self._post("info", "Stopped by user.")
+                        break  # still writes the transcript footer below
+                    reply = enforce_wrap_rules(reply, cfg["turns"] - turn + 1)
+                    bot["history"].append({"role": "assistant", "content": reply})
+                    self._post("say_end", (bot["name"], bot["model"], reply, turn))
+                    speaker = bot["peer"]
+
+                    stopped = False
+                    if turn < cfg["turns"]:
+                        # The delay spaces out dispatches rather than following each reply,
+                        # and Stop cuts it short.
+                        stopped = self.stop_event.wait(max(0.0, next_dispatch - time.monotonic()))
+                        if not stopped:
+                            pending = dispatch(speaker, turn + 1, reply)
+                            next_dispatch = time.monotonic() + cfg["delay"]
+
+                    log_line(fp, bot["name"], bot["model"], reply, turn)
+                    if stopped:
+                        self._post("info", "Stopped by user.")
                         break
 
-                    if speaker == "aihub":
-                        history_aihub.append({"role": "user",
-                                              "content": relay_with_wrap("Jane", last_message, remaining)})
-                        history_aihub = trim_history(history_aihub, cfg["history_window"])
-                        reply = ollama_chat(cfg["aihub_url"], cfg["aihub_model"], history_aihub,
-                                            cfg["temperature"], cfg["timeout"], cfg["retries"], cfg["backoff"],
-                                            cfg["num_predict"])
-                        reply = clean(reply)
-                        reply = enforce_wrap_rules(reply, remaining)
-                        history_aihub.append({"role": "assistant", "content": reply})
-                        self.ui_queue.put(("say", ("Bob", cfg["aihub_model"], reply, turn)))
-                        log_line(fp, "Bob", cfg["aihub_model"], reply, turn)
-                        last_message = reply
-                        speaker = "node01"
-                    else:
-                        history_node01.append({"role": "user",
-                                               "content": relay_with_wrap("Bob", last_message, remaining)})
-                        history_node01 = trim_history(history_node01, cfg["history_window"])
-                        reply = ollama_chat(cfg["node01_url"], cfg["node01_model"], history_node01,
-                                            cfg["temperature"], cfg["timeout"], cfg["retries"], cfg["backoff"],
-                                            cfg["num_predict"])
-                        reply = clean(reply)
-                        reply = enforce_wrap_rules(reply, remaining)
-                        history_node01.append({"role": "assistant", "content": reply})
-                        self.ui_queue.put(("say", ("Jane", cfg["node01_model"], reply, turn)))
-                        log_line(fp, "Jane", cfg["node01_model"], reply, turn)
-                        last_message = reply
-                        speaker = "aihub"
-
-                    time.sleep(cfg["delay"])
-
                 fp.write("=== End of conversation ===\n")
                 fp.write(f"Finished: {datetime.datetime.now().isoformat(timespec='seconds')}\n")
 
-            self.ui_queue.put(("turns_left", "Turns left: 0"))
-            self.ui_queue.put(("done", "Conversation complete."))
+            self._post("turns_left", "Turns left: 0")
+            self._post("done", "Conversation complete.")
+        except ChatCancelled:
+            self._post("done", "Stopped by user.")
         except Exception as e:
             err = "".join(traceback.format_exception(e))
-            self.ui_queue.put(("error", err))
+            self._post("error", err)
+
+    # ---------- UI queue ----------
+    def _post(self, kind: str, payload: Any):
+        # Called from worker threads. event_generate(when="tail") is thread-safe with Tk 8.6's
+        # threaded Tcl and wakes the UI only when there is something to show, instead of a
+        # timer polling 10x a second.
+        self.ui_queue.put((kind, payload))
+        try:
+            self.event_generate("<<UIQueue>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # window closed, or no wakeup possible: _fallback_drain picks the message up
+
+    def _fallback_drain(self):
+        if not self.ui_queue.empty():
+            self._drain_ui_queue()
+        self.after(UI_FALLBACK_MS, self._fallback_drain)
+
+    def _drain_ui_queue(self):
+        # Console lines drained in one pass go in with a single insert (one state/insert/see
+        # round of Tcl calls instead of one per line); flushed before anything that must
+        # appear after them.
+        pending_text: List[str] = []
+        pending_chunks: List[str] = []
+
+        def flush_text():
+            if pending_chunks:
+                self._insert_console("".join(pending_chunks))
+                pending_chunks.clear()
+            if pending_text:
+                self._append_console("\n".join(pending_text))
+                pending_text.clear()
 
-    # ---------- UI queue poll ----------
-    def _poll_ui_queue(self):
         try:
             while True:
                 kind, payload = self.ui_queue.get_nowait()
@@ -581,24 +976,45 @@ class CrossChatGUI(ttk.Frame):
                     self._update_start_state()
                     self._set_status(f"{label} selected: {chosen}")
                 elif kind == "progress":
-                    self._append_console(payload)
-                elif kind == "say":
+                    pending_text.append(payload)
+                elif kind == "say_start":
+                    who, model = payload
+                    pending_text.append(f"\n[{who} / {model}]")
+                    flush_text()
+                    # Left gravity: the mark stays put while the reply streams in after it.
+                    self.console.mark_set("stream_start", "end-1c")
+                    self.console.mark_gravity("stream_start", "left")
+                elif kind == "stream_chunk":
+                    who, text = payload
+                    pending_chunks.append(text)
+                elif kind == "say_end":
+                    # Swap the raw streamed text for the cleaned, wrap-enforced reply.
                     who, model, text, turn = payload
-                    self._append_console(f"\n[{who} / {model}]\n{text}\n")
+                    pending_chunks.clear()
+                    self._replace_stream(text + "\n\n")
                 elif kind == "info":
-                    self._append_console(payload)
+                    pending_text.append(payload)
                 elif kind == "done":
-                    self._append_console(payload)
+                    pending_text.append(payload)
+                    flush_text()
                     self._finish_run()
                 elif kind == "error":
-                    self._append_console("ERROR:\n" + payload)
+                    pending_text.append("ERROR:\n" + payload)
+                    flush_text()
                     messagebox.showerror("Error", payload)
                     self._finish_run()
                 elif kind == "turns_left":
                     self.turns_left_var.set(payload)
         except queue.Empty:
             pass
-        self.after(100, self._poll_ui_queue)
+        flush_text()
+
+    def _on_close(self):
+        # Pool threads aren't daemons: drop queued jobs and tell running ones to stop.
+        self._closing.set()
+        self.stop_event.set()
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        self.master.destroy()
 
     def _finish_run(self):
         self.stop_event.clear()
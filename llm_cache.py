@@ -0,0 +1,91 @@
+"""
+Exact-match reply cache for Ollama chat calls, backed by SQLite.
+
+For development and demo replays: a request that was seen before (same model, messages and
+sampling options) is answered from disk in about a millisecond instead of being generated
+again. Callers decide which calls are safe to cache; by default only temperature 0 ones.
+"""
+import hashlib, json, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def cache_key(model: str, messages: List[Dict[str, str]], temperature: float, num_predict: int) -> str:
+    request: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "num_predict": num_predict,
+    }
+    if orjson is not None:
+        raw = orjson.dumps(request, option=orjson.OPT_SORT_KEYS)
+    else:
+        raw = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=20).hexdigest()
+
+class ResponseCache:
+    """
+    key -> reply text, in a WAL-mode SQLite file. Safe to share between threads.
+    cache_all=False limits it to deterministic calls (see cacheable()).
+    """
+    def __init__(self, path: str, cache_all: bool = False):
+        self.cache_all = cache_all
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, content TEXT, ts INTEGER)")
+        self._db.commit()
+
+    def cacheable(self, temperature: float) -> bool:
+        return self.cache_all or temperature == 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT content FROM cache WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, content: str):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO cache(key, content, ts) VALUES (?, ?, ?)",
+                             (key, content, int(time.time())))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class MemoryCache:
+    """
+    Same interface as ResponseCache, kept in process memory: the least recently used entry
+    is dropped once maxsize is reached. For repeats within one session (e.g. GUI reruns).
+    """
+    def __init__(self, maxsize: int = 256, cache_all: bool = False):
+        self.cache_all = cache_all
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+
+    def cacheable(self, temperature: float) -> bool:
+        return self.cache_all or temperature == 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            content = self._data.get(key)
+            if content is not None:
+                self._data.move_to_end(key)
+        return content
+
+    def put(self, key: str, content: str):
+        with self._lock:
+            self._data[key] = content
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def close(self):
+        with self._lock:
+            self._data.clear()